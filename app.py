@@ -1,26 +1,206 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from gtts import gTTS
 import os
 from dotenv import load_dotenv
 import assemblyai as aai
-from time import time as get_time
+from time import monotonic, sleep, time as get_time
 from audio_recorder_streamlit import audio_recorder
+from streamlit_webrtc import webrtc_streamer, WebRtcMode, AudioProcessorBase
+from assemblyai.streaming.v3 import (
+    StreamingClient,
+    StreamingClientOptions,
+    StreamingEvents,
+    StreamingParameters,
+)
 import io
+from pathlib import Path
+import orjson
+import re
+import hashlib
+import logging
+import importlib
+import socket
+import threading
+import uuid
+from collections import OrderedDict
+from diskcache import Cache as DiskCache
+from queue import Empty, LifoQueue, Queue
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+import struct
+import math
+import numpy as np
+import av
+
+# Diagnostics go to the server log, never to the page
+logger = logging.getLogger(__name__)
 
 # ------------------------------
 # Load API keys
 # ------------------------------
-load_dotenv()
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
+@st.cache_resource(show_spinner=False)
+def load_settings():
+    """Parse .env and build the static auth headers once per server process, not on every rerun."""
+    load_dotenv()
+    openrouter_key = os.getenv("OPENROUTER_API_KEY")
+    assemblyai_key = os.getenv("ASSEMBLYAI_API_KEY")
+    # Content-Type comes from the shared session
+    openrouter_headers = {"Authorization": f"Bearer {openrouter_key}"} if openrouter_key else None
+    return openrouter_key, assemblyai_key, openrouter_headers
+
+OPENROUTER_API_KEY, ASSEMBLYAI_API_KEY, OPENROUTER_HEADERS = load_settings()
+
+# Local Piper TTS skips the Google round-trip; gTTS stays the default
+USE_LOCAL_TTS = os.getenv("USE_LOCAL_TTS", "").lower() in ("1", "true", "yes")
+PIPER_MODEL = os.getenv("PIPER_MODEL", "en_US-amy-medium.onnx")
+TTS_FORMAT, TTS_EXT = ("audio/wav", "wav") if USE_LOCAL_TTS else ("audio/mp3", "mp3")
+TTS_VOICE = f"piper:{PIPER_MODEL}" if USE_LOCAL_TTS else "gtts:en"
 
 if ASSEMBLYAI_API_KEY:
     aai.settings.api_key = ASSEMBLYAI_API_KEY
+# The SDK polls batch jobs every 3 s by default - most of the wait for a short clip.
+# Set before get_transcriber() builds its client, which copies the settings.
+aai.settings.polling_interval = 0.5
 
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-AUDIO_DIR = "./audio_files"
-os.makedirs(AUDIO_DIR, exist_ok=True)
+OPENROUTER_PAYLOAD_BASE = {"model": "openai/gpt-4o-mini", "stream": True}
+ASSEMBLYAI_UPLOAD_URL = "https://api.assemblyai.com/v2/upload"
+
+# AssemblyAI models run at 16 kHz; anything higher is wasted upload
+TARGET_SAMPLE_RATE = 16000
+
+# Energy-based VAD thresholds (dBFS)
+SILENCE_DB = -40.0     # whole clip quieter than this is dead air
+SPEECH_DB = -35.0      # a window louder than this counts as speech
+VAD_WINDOW_S = 0.25
+MIN_SPEECH_S = 0.5     # less voiced audio than this isn't worth an API call
+HIGHPASS_HZ = 80       # below the voice band: DC offset, handling noise, HVAC rumble
+
+# Sentence boundaries for pipelined TTS: end punctuation + whitespace, or a line break
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+# gTTS sends at most 100 characters per request and fetches a long sentence's parts one
+# by one; splitting at clause breaks first lets the parts synthesize and play in parallel
+CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+TTS_PART_CHARS = 100
+RESPONSE_CACHE_SIZE = 256
+# Replies also persist on disk so restarts and new sessions start warm
+LLM_CACHE_DIR = Path("audio_files") / "llm_cache"
+LLM_CACHE_MAX_MB = 100
+LLM_CACHE_TTL_S = 7 * 24 * 3600
+TTS_WORKERS = 4  # sentences synthesized concurrently per reply
+
+# Scratch buffers for TTS output are recycled instead of reallocated per turn
+_BUF_POOL = LifoQueue()
+BUF_POOL_MAX_BYTES = 2 * 1024 * 1024
+
+# Synthesized speech is cached on disk by text hash; least recently used clips go first past the budget
+TTS_CACHE_DIR = Path("audio_files") / "tts"
+TTS_CACHE_MAX_MB = 50
+TTS_MEMORY_CACHE_SIZE = 512  # clips also kept in RAM; a sentence is tens of KB
+
+# Realtime streaming: AssemblyAI accepts 50-1000 ms chunks, WebRTC delivers 20 ms frames
+STREAM_CHUNK_MS = 100
+# How often the Live tab checks for finished turns; the rest of the page stays interactive
+LIVE_POLL_S = 0.5
+RTC_CONFIGURATION = {"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]}
+
+# (connect, read) seconds; read applies between streamed chunks, not to the whole reply
+HTTP_TIMEOUT = (3.05, 60)
+# In-flight calls per upstream service across all sessions; bursts queue instead of tripping rate limits
+API_CONCURRENCY = 8
+# Sustained request rate per upstream service across all sessions (token bucket), and its burst size
+API_RATE_PER_MIN = 120
+API_BURST = 16
+# Give up on an AssemblyAI job that hasn't finished polling by then instead of pinning the worker
+STT_POLL_TIMEOUT = 120
+
+# Hosts contacted on every turn: AssemblyAI (STT), OpenRouter (LLM), Google Translate (gTTS)
+WARMUP_URLS = [
+    "https://api.assemblyai.com",
+    "https://openrouter.ai",
+    "https://translate.google.com",
+]
+
+# ------------------------------
+# Shared HTTP Session & Warm-up
+# ------------------------------
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """One keep-alive session per server process, shared across reruns."""
+    session = requests.Session()
+    # Back off exponentially on rate limits / server errors; fail fast on other 4xx
+    retry = Retry(
+        total=4,
+        backoff_factor=0.5,
+        backoff_jitter=0.3,  # de-synchronize retries from concurrent sessions
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods={"POST", "GET"},
+        respect_retry_after_header=True,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry))
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+@st.cache_resource(show_spinner=False)
+def api_slots(service):
+    """Process-wide cap on concurrent calls to one upstream service, shared by all sessions."""
+    return threading.BoundedSemaphore(API_CONCURRENCY)
+
+class TokenBucket:
+    """Blocking token bucket: `rate` calls per second on average, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.stamp = monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            sleep(delay)  # outside the lock so other callers can refill-check meanwhile
+
+@st.cache_resource(show_spinner=False)
+def api_rate(service):
+    """Process-wide request-rate limit for one upstream service; waits instead of collecting 429s."""
+    return TokenBucket(API_RATE_PER_MIN / 60, API_BURST)
+
+def _warmup(session):
+    # Resolve DNS and open TLS connections so the first real request reuses them
+    for url in WARMUP_URLS:
+        try:
+            socket.getaddrinfo(url.split("://", 1)[1], 443)
+            session.head(url, timeout=5)
+        except Exception as e:
+            logger.debug("Warm-up of %s failed: %s", url, e)
+    # Pay the remaining first-turn costs while the user is still reading the page
+    preloads = [partial(importlib.import_module, "scipy.signal")]  # imported lazily by the DSP helpers
+    if aai.settings.api_key:
+        preloads.append(get_transcriber)
+    if USE_LOCAL_TTS:
+        preloads.append(get_piper_voice)
+    for preload in preloads:
+        try:
+            preload()
+        except Exception as e:
+            logger.debug("Preload %r failed: %s", preload, e)  # the real call will surface it
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    thread = threading.Thread(target=_warmup, args=(get_http_session(),), daemon=True)
+    thread.start()
+    return thread
 
 # ------------------------------
 # Streamlit Page Configuration
@@ -29,6 +209,8 @@ st.set_page_config(page_title="Voice Bot", page_icon="🎙️", layout="wide")
 st.title("🎙️ Universal Voice Bot")
 st.write("Works with ANY microphone - built-in, USB, wired, or Bluetooth! 🎧")
 
+SESSION = get_http_session()
+
 # ------------------------------
 # Audio Device Setup Guide
 # ------------------------------
@@ -142,88 +324,663 @@ if 'transcription' not in st.session_state:
     st.session_state.transcription = None
 if 'bot_response' not in st.session_state:
     st.session_state.bot_response = None
+if 'bot_audio' not in st.session_state:
+    st.session_state.bot_audio = None     # spoken bot_response, kept once rather than per history entry
 if 'conversation_history' not in st.session_state:
     st.session_state.conversation_history = []
+if 'processed_hash' not in st.session_state:
+    st.session_state.processed_hash = None
+if 'pending_clips' not in st.session_state:
+    st.session_state.pending_clips = []   # (digest, wav bytes) queued for one batch
+if 'live_answer' not in st.session_state:
+    st.session_state.live_answer = None   # (user, bot, audio) of the last answer given in the Live tab
 
 # ------------------------------
 # Helper Functions
 # ------------------------------
 
-def get_response(prompt):
+def stream_response(prompt):
+    """Yield reply text deltas from OpenRouter's SSE stream as they are generated."""
     if not OPENROUTER_API_KEY:
-        st.error("API key not found. Add OPENROUTER_API_KEY to .env.")
-        return None
-    headers = {"Authorization": f"Bearer {OPENROUTER_API_KEY}", "Content-Type": "application/json"}
-    payload = {"model": "openai/gpt-4o-mini", "messages": [{"role": "user", "content": prompt}]}
-    try:
-        response = requests.post(OPENROUTER_URL, headers=headers, json=payload)
+        raise RuntimeError("API key not found. Add OPENROUTER_API_KEY to .env.")
+    payload = {**OPENROUTER_PAYLOAD_BASE, "messages": [{"role": "user", "content": prompt}]}
+    # orjson encodes/decodes in Rust; Content-Type: application/json comes from the session
+    with api_slots("openrouter"), SESSION.post(OPENROUTER_URL, headers=OPENROUTER_HEADERS,
+                                                data=orjson.dumps(payload), stream=True,
+                                                timeout=HTTP_TIMEOUT) as response:
         response.raise_for_status()
-        result = response.json()
-        return result["choices"][0]["message"]["content"]
-    except requests.RequestException as e:
-        st.error(f"❌ OpenRouter API Error: {e}")
-        return None
+        for line in response.iter_lines():
+            # Skip blank keep-alives and ": OPENROUTER PROCESSING" comments
+            if not line.startswith(b"data: "):
+                continue
+            data = line[len(b"data: "):]
+            if data == b"[DONE]":
+                break
+            chunk = orjson.loads(data)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"].get("message", chunk["error"]))
+            for choice in chunk.get("choices", []):
+                if choice["delta"].get("content"):
+                    yield choice["delta"]["content"]
 
-def text_to_speech(text):
+def iter_sentences(chunks):
+    """Regroup streamed text chunks into sentences, keeping the original whitespace."""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        for match in SENTENCE_END.finditer(buffer):
+            yield buffer[start:match.end()]
+            start = match.end()
+        buffer = buffer[start:]
+    if buffer:
+        yield buffer
+
+def split_for_tts(sentence):
+    """Split a sentence into pieces of at most TTS_PART_CHARS, at clause breaks where possible."""
+    parts = []
+    for clause in CLAUSE_END.split(sentence):
+        words = [clause] if len(clause) <= TTS_PART_CHARS else clause.split()
+        for word in words:
+            if parts and len(parts[-1]) + 1 + len(word) <= TTS_PART_CHARS:
+                parts[-1] += " " + word
+            else:
+                parts.append(word)
+    return parts
+
+def _lru_get(lru, key):
+    """Look up `key` in an (OrderedDict, Lock) LRU, marking it most recently used."""
+    cache, lock = lru
+    with lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+    return value
+
+def _lru_put(lru, key, value, max_size):
+    """Store `value` in an (OrderedDict, Lock) LRU, evicting the oldest entries past `max_size`."""
+    cache, lock = lru
+    with lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+@st.cache_resource(show_spinner=False)
+def _response_cache():
+    """Process-wide LRU of prompt -> full reply; streamed replies are stored once complete.
+
+    Pipeline threads from every session share it, so all access goes through the lock.
+    """
+    return OrderedDict(), threading.Lock()
+
+def _tap(chunks, callback):
+    for chunk in chunks:
+        callback(chunk)
+        yield chunk
+
+@st.cache_resource(show_spinner=False)
+def _llm_disk_cache():
+    """Process-wide handle on the on-disk reply cache (thread- and process-safe)."""
+    return DiskCache(str(LLM_CACHE_DIR), size_limit=LLM_CACHE_MAX_MB * 1024 * 1024)
+
+def stream_reply(prompt, on_token=None):
+    """Yield the reply to `prompt` sentence by sentence, serving repeats from the cache.
+
+    `on_token` is called with each raw delta as it arrives, ahead of sentence grouping.
+    """
+    key = " ".join(prompt.lower().split())  # "What time is it? " and "what time is it?" share an entry
+    cached = _lru_get(_response_cache(), key)
+    if cached is None:
+        cached = _llm_disk_cache().get(key)
+    chunks = [cached] if cached else stream_response(prompt)
+    if on_token is not None:
+        chunks = _tap(chunks, on_token)
+    sentences = []
+    for sentence in iter_sentences(chunks):
+        sentences.append(sentence)
+        yield sentence
+    reply = "".join(sentences)
+    if reply != cached:
+        _llm_disk_cache().set(key, reply, expire=LLM_CACHE_TTL_S)
+    _lru_put(_response_cache(), key, reply, RESPONSE_CACHE_SIZE)
+
+def _acquire_buf():
+    """Take a scratch BytesIO from the pool, emptied and rewound."""
+    try:
+        buffer = _BUF_POOL.get_nowait()
+    except Empty:
+        return io.BytesIO()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return buffer
+
+def _release_buf(buffer):
+    # Don't let one unusually long recording pin its memory in the pool
+    if buffer.getbuffer().nbytes <= BUF_POOL_MAX_BYTES:
+        _BUF_POOL.put(buffer)
+
+@st.cache_resource(show_spinner=False)
+def get_piper_voice():
+    """Load the Piper ONNX voice once per server process."""
+    from piper import PiperVoice  # optional dependency, only needed with USE_LOCAL_TTS
+    return PiperVoice.load(PIPER_MODEL)
+
+def _synthesize_local(text):
+    voice = get_piper_voice()
+    pcm = b"".join(chunk.audio_int16_bytes for chunk in voice.synthesize(text))
+    return b"".join((_wav_header(len(pcm), sample_rate=voice.config.sample_rate), pcm))
+
+def _synthesize_gtts(text):
+    buffer = _acquire_buf()
+    try:
+        gTTS(text, timeout=HTTP_TIMEOUT).write_to_fp(buffer)  # gTTS defaults to no timeout
+        return buffer.getvalue()
+    finally:
+        _release_buf(buffer)
+
+@st.cache_resource(show_spinner=False)
+def _tts_memory_cache():
+    """Process-wide LRU of synthesized clips in front of the disk cache; TTS workers share it."""
+    return OrderedDict(), threading.Lock()
+
+@st.cache_resource(show_spinner=False)
+def _tts_disk_cache():
+    """Process-wide handle on the on-disk clip cache; diskcache enforces the size budget on every write."""
+    return DiskCache(str(TTS_CACHE_DIR), size_limit=TTS_CACHE_MAX_MB * 1024 * 1024,
+                     eviction_policy="least-recently-used")
+
+def _load_or_synthesize(key, text):
+    disk = _tts_disk_cache()
+    audio = disk.get(key)
+    if audio is not None:
+        return audio
+    
+    audio = _synthesize_local(text) if USE_LOCAL_TTS else _synthesize_gtts(text)
     try:
-        tts = gTTS(text)
-        temp_file = os.path.join(AUDIO_DIR, f"tts_{int(get_time())}.mp3")
-        tts.save(temp_file)
-        return temp_file
+        disk.set(key, audio)
     except Exception as e:
-        st.error(f"❌ TTS Error: {e}")
+        logger.debug("TTS cache write failed: %s", e)  # best-effort; the caller still gets the audio
+    return audio
+
+def text_to_speech(text):
+    """Synthesize `text` and return the audio bytes (TTS_FORMAT), reusing earlier syntheses.
+
+    Repeats are served from memory, then from disk, before going to the TTS engine.
+    """
+    # Keyed on the voice too, so switching engine or model never serves stale audio.
+    # Spacing doesn't change the speech, but case can ("US" vs "us"), so it stays in the key
+    normalized = " ".join(text.split())
+    key = hashlib.blake2b(f"{TTS_VOICE}\n{normalized}".encode("utf-8"), digest_size=16).hexdigest()
+    audio = _lru_get(_tts_memory_cache(), key)
+    if audio is None:
+        audio = _load_or_synthesize(key, text)
+        _lru_put(_tts_memory_cache(), key, audio, TTS_MEMORY_CACHE_SIZE)
+    return audio
+
+def join_tts_audio(chunks):
+    """Concatenate per-sentence TTS clips into one playable file."""
+    if not USE_LOCAL_TTS:
+        return b"".join(chunks)  # MP3 frames concatenate cleanly
+    # WAV: keep one header, sized for all of the sample data
+    sample_rate = struct.unpack_from("<I", chunks[0], 24)[0]
+    pcm = b"".join(chunk[44:] for chunk in chunks)
+    return b"".join((_wav_header(len(pcm), sample_rate=sample_rate), pcm))
+
+def _rms_db(pcm):
+    """RMS level in dBFS of int16 PCM along the last axis.
+
+    Squares are accumulated in int64 by einsum, so no float copy of the audio is made.
+    """
+    sum_sq = np.einsum("...i,...i->...", pcm, pcm, dtype=np.int64)
+    return 20 * np.log10(np.sqrt(sum_sq / pcm.shape[-1]) / 32768 + 1e-9)
+
+def trim_silence(pcm, sample_rate):
+    """Cut silence from mono int16 PCM, keeping one window of padding around speech.
+
+    Returns None if there is less than MIN_SPEECH_S of speech.
+    """
+    if pcm.size == 0 or _rms_db(pcm) < SILENCE_DB:
         return None
 
-def transcribe_audio(audio_bytes):
-    """Transcribe audio using AssemblyAI"""
-    if not audio_bytes or len(audio_bytes) == 0:
-        st.error("❌ No audio data provided.")
+    # RMS per fixed window
+    win = max(1, int(sample_rate * VAD_WINDOW_S))
+    n_win = max(1, pcm.size // win)
+    framed = pcm[:n_win * win].reshape(n_win, -1) if pcm.size >= win else pcm[None, :]
+    voiced = _rms_db(framed) > SPEECH_DB
+    if voiced.sum() * VAD_WINDOW_S < MIN_SPEECH_S:
         return None
-    if not aai.settings.api_key:
-        st.error("❌ AssemblyAI API key not found.")
+
+    # Pad each voiced window by one either side so word onsets aren't clipped;
+    # longer pauses between words are dropped along with leading/trailing silence
+    keep = voiced.copy()
+    keep[1:] |= voiced[:-1]
+    keep[:-1] |= voiced[1:]
+    kept = framed[keep].reshape(-1)
+    return np.concatenate((kept, pcm[n_win * win:])) if keep[-1] else kept
+
+def highpass(pcm, sample_rate):
+    """Strip DC offset and rumble below HIGHPASS_HZ from mono int16 PCM."""
+    if not pcm.size:
+        return pcm
+    from scipy.signal import butter, sosfilt  # lazy, like resample_pcm's import
+    sos = butter(2, HIGHPASS_HZ, btype="highpass", fs=sample_rate, output="sos")
+    return np.clip(sosfilt(sos, pcm.astype(np.float32)), -32768, 32767).astype(np.int16)
+
+def normalize_peak(pcm):
+    """Scale int16 PCM so its loudest sample sits just below full scale."""
+    wide = pcm.astype(np.int32)  # abs(-32768) overflows int16
+    peak = int(np.abs(wide).max()) if wide.size else 0
+    if peak == 0 or peak >= 32760:
+        return pcm  # digital silence, or already at full scale
+    return np.clip(wide * (32767 / peak), -32768, 32767).astype(np.int16)
+
+def decode_audio(audio_bytes):
+    """Decode any container/codec in-process to 16 kHz mono int16 PCM.
+
+    PyAV handles demuxing, decoding and the mono/s16 conversion; the rate change
+    is a single resample_pcm pass over the whole clip.
+    """
+    resampler = av.AudioResampler(format="s16", layout="mono")
+    chunks = []
+    with av.open(io.BytesIO(audio_bytes)) as container:
+        stream = container.streams.audio[0]
+        sample_rate = stream.rate
+        for frame in container.decode(stream):
+            chunks.extend(f.to_ndarray().reshape(-1) for f in resampler.resample(frame))
+        chunks.extend(f.to_ndarray().reshape(-1) for f in resampler.resample(None))  # flush
+    pcm = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16)
+    return resample_pcm(pcm, sample_rate)
+
+def resample_pcm(pcm, sample_rate):
+    """Resample mono int16 PCM to TARGET_SAMPLE_RATE in one polyphase FIR pass."""
+    if sample_rate == TARGET_SAMPLE_RATE or not pcm.size:
+        return pcm
+    # scipy.signal costs ~0.8 s to import; kept off the startup path, and _warmup loads it in the background
+    from scipy.signal import resample_poly
+    g = math.gcd(sample_rate, TARGET_SAMPLE_RATE)
+    pcm = resample_poly(pcm.astype(np.float32), TARGET_SAMPLE_RATE // g, sample_rate // g)
+    return np.clip(pcm, -32768, 32767).astype(np.int16)
+
+def _wav_header(n_bytes, sample_rate=TARGET_SAMPLE_RATE, channels=1, sample_width=2):
+    """Canonical 44-byte PCM WAV header for `n_bytes` of sample data."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + n_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate,
+        sample_rate * channels * sample_width, channels * sample_width, sample_width * 8,
+        b"data", n_bytes,
+    )
+
+def preprocess_audio(audio_bytes):
+    """Decode, high-pass, trim silence and normalize a recording into a 16 kHz mono WAV.
+
+    Returns None if no speech is found.
+    """
+    try:
+        pcm = decode_audio(audio_bytes)
+    except av.FFmpegError:
+        return audio_bytes  # Unknown format - let AssemblyAI decode it
+
+    # Filter first so rumble neither passes the VAD nor eats normalization headroom
+    pcm = highpass(pcm, TARGET_SAMPLE_RATE)
+    pcm = trim_silence(pcm, TARGET_SAMPLE_RATE)
+    if pcm is None:
         return None
+    pcm = normalize_peak(pcm)
+
+    data = pcm.tobytes()
+    return b"".join((_wav_header(len(data)), data))
+
+@st.cache_resource(show_spinner=False)
+def get_transcriber():
+    """One AssemblyAI client (HTTP pool + polling threads) per server process."""
+    return aai.Transcriber(max_workers=8)
+
+@st.cache_resource(show_spinner=False)
+def get_aai_config(accurate=False):
+    # Short interactive turns don't need the slowest model
+    return aai.TranscriptionConfig(
+        speech_model=aai.SpeechModel.best if accurate else aai.SpeechModel.nano,
+        language_code="en",
+        punctuate=True,
+        format_text=True,
+    )
+
+def _prepare_clip(audio_bytes):
+    """Validate and preprocess one recording. Returns None for dead air or under MIN_SPEECH_S of speech."""
+    if not audio_bytes or len(audio_bytes) == 0:
+        raise RuntimeError("No audio data provided.")
     
-    # Save audio to temporary file
-    temp_path = os.path.join(AUDIO_DIR, f"recording_{int(get_time())}.wav")
-    try:
-        with open(temp_path, "wb") as f:
-            f.write(audio_bytes)
-        
-        # Check file size
-        file_size = os.path.getsize(temp_path)
-        if file_size < 1000:
-            st.error("❌ Audio too short. Please record for at least 2-3 seconds.")
-            return None
-        
-        # Transcribe with optimized settings for Bluetooth audio
-        config = aai.TranscriptionConfig(
-            speech_model=aai.SpeechModel.best,
-            language_code="en",
-            punctuate=True,
-            format_text=True,
-            dual_channel=False,  # Bluetooth is typically mono
-            audio_start_from=0,
-            audio_end_at=None
+    # Skip the API round-trip entirely for dead-air and too-short recordings;
+    # trim_silence() applies the MIN_SPEECH_S limit
+    return preprocess_audio(audio_bytes)
+
+def upload_audio(audio_bytes):
+    """Upload in-memory audio to AssemblyAI and return its upload_url (no temp files)."""
+    api_rate("assemblyai").acquire()
+    with api_slots("assemblyai"):
+        response = SESSION.post(
+            ASSEMBLYAI_UPLOAD_URL,
+            headers={"authorization": aai.settings.api_key, "Content-Type": "application/octet-stream"},
+            data=audio_bytes,
+            timeout=HTTP_TIMEOUT,
         )
-        transcriber = aai.Transcriber()
-        transcript = transcriber.transcribe(temp_path, config=config)
-        
-        if transcript.status == aai.TranscriptStatus.error:
-            st.error(f"❌ Transcription error: {transcript.error}")
-            return None
-        
-        return transcript.text.strip() if transcript.text else None
-    except Exception as e:
-        st.error(f"❌ Transcription Error: {e}")
+    response.raise_for_status()
+    return orjson.loads(response.content)["upload_url"]
+
+def _submit_clip(audio_bytes, config):
+    """Preprocess, upload and start transcribing one recording. Returns None for dead air."""
+    clip = _prepare_clip(audio_bytes)
+    if clip is None:
         return None
+    url = upload_audio(clip)
+    api_rate("assemblyai").acquire()  # the job is one create call, then polling
+    # Audio is already hosted, so the SDK only creates and polls the job; the shared
+    # transcriber's 8 workers cap in-flight jobs across sessions the same way api_slots does
+    return get_transcriber().transcribe_async(url, config=config, poll_timeout=STT_POLL_TIMEOUT)
+
+def _transcript_text(job):
+    transcript = job.result()
+    if transcript.status == aai.TranscriptStatus.error:
+        raise RuntimeError(transcript.error)
+    return transcript.text.strip() if transcript.text else ""
+
+def transcribe_many(clips, accurate=False):
+    """Transcribe several recordings concurrently.
+
+    Returns one result per clip: its text ("" for a silent clip), or the exception
+    that clip raised. A bad clip doesn't abort the batch - the others are already
+    uploaded and billed, so their transcripts are still returned.
+    Every clip is submitted up front and the SDK polls them in parallel, so a
+    batch costs roughly one round-trip instead of one per clip.
+    """
+    if not aai.settings.api_key:
+        raise RuntimeError("AssemblyAI API key not found.")
+    # Each clip is preprocessed, uploaded and submitted in its own worker, so one clip's
+    # decode/filter work overlaps another's upload and polling (numpy/scipy release the GIL)
+    config = get_aai_config(accurate)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        submitted = [pool.submit(_submit_clip, clip, config) for clip in clips]
+    
+    results = []
+    for future in submitted:
+        try:
+            job = future.result()
+            results.append("" if job is None else _transcript_text(job))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def transcribe_audio(audio_bytes, accurate=False):
+    """Transcribe audio using AssemblyAI. Returns "" when the clip is silent.
+
+    Uses the low-latency `nano` model unless `accurate` opts into `best`.
+    """
+    result = transcribe_many([audio_bytes], accurate)[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def _transcribe_cached(audio_hash, accurate, _audio_bytes):
+    # Leading underscore keeps Streamlit from hashing the raw audio; the digest is the key
+    return transcribe_audio(_audio_bytes, accurate)
+
+def audio_digest(audio_bytes):
+    """Content hash of a recording - ~1 ms for 500 KB, and unlike len() it can't collide on equal durations."""
+    return hashlib.blake2b(audio_bytes, digest_size=16).digest()
+
+def transcribe_audio_cached(audio_bytes, accurate=False, audio_hash=None):
+    """Memoized transcribe_audio so reruns on the same recording skip STT."""
+    if audio_hash is None:
+        audio_hash = audio_digest(audio_bytes)
+    return _transcribe_cached(audio_hash, accurate, audio_bytes)
+
+# ------------------------------
+# STT → LLM → TTS Pipeline
+# ------------------------------
+# Each stage runs in its own worker thread and hands results to the next
+# stage through a queue. Workers never touch `st` - the script thread
+# drains the event queue and does all rendering.
+_DONE = object()
+
+def _stage_worker(stage, fn, label, emit, in_q, out_q, events, cancelled):
+    # `fn` yields zero or more outputs per input, so a streaming stage (the LLM)
+    # can feed the next stage before it has finished. With `emit` off the outputs
+    # only go downstream; the stage reports progress itself.
+    while (item := in_q.get()) is not _DONE:
+        if cancelled.is_set():
+            continue  # drain to _DONE without doing any more work
+        try:
+            for result in fn(item):
+                if cancelled.is_set():
+                    break
+                if emit:
+                    events.put((stage, result))
+                if result and out_q is not None:
+                    out_q.put(result)
+        except Exception as e:
+            events.put(("error", f"❌ {label} Error: {e}"))
+    if out_q is not None:
+        out_q.put(_DONE)
+    events.put(("done", stage))
+
+def _transcribe_stage(audio_bytes, accurate, audio_hash):
+    yield transcribe_audio_cached(audio_bytes, accurate, audio_hash)
+
+def _submit_speech(sentence, pool):
+    # Synthesis of later sentences overlaps with earlier ones; futures keep reply order
+    sentence = sentence.strip()
+    if not sentence:
+        return
+    # Piper synthesizes a whole sentence faster than real time; only gTTS gains from splitting
+    parts = [sentence] if USE_LOCAL_TTS else split_for_tts(sentence)
+    yield [pool.submit(text_to_speech, part) for part in parts]
+
+def _await_speech(futures):
+    # A sentence's parts synthesize in parallel but play back as one clip
+    yield join_tts_audio([future.result() for future in futures])
+
+def run_pipeline(audio_bytes=None, prompt=None, accurate=False, audio_hash=None):
+    """Yield (stage, payload) events as the STT, LLM and TTS workers produce them.
+
+    Pass `audio_bytes` to start at transcription or `prompt` to start at the LLM.
+    The LLM stage emits one event per streamed token, and TTS starts on the
+    first complete sentence while the rest of the reply is still streaming.
+    Up to TTS_WORKERS sentences are synthesized at once but emitted in order.
+    Closing the generator (e.g. the script is stopped or rerun) cancels the workers.
+    """
+    audio_q, text_q, tts_q, speech_q, events = Queue(), Queue(), Queue(), Queue(), Queue()
+    cancelled = threading.Event()
+    tts_pool = ThreadPoolExecutor(max_workers=TTS_WORKERS)
+    stages = [
+        # (stage, function, error label, emit outputs as events)
+        ("stt", partial(_transcribe_stage, accurate=accurate, audio_hash=audio_hash), "Transcription", True),
+        # Tokens go to the UI as they arrive; whole sentences go on to TTS
+        ("llm", partial(stream_reply, on_token=lambda token: events.put(("llm", token))), "OpenRouter API", False),
+        ("tts_submit", partial(_submit_speech, pool=tts_pool), "TTS", False),
+        ("tts", _await_speech, "TTS", True),
+    ]
+    queues = [audio_q, text_q, tts_q, speech_q, None]
+    for (stage, fn, label, emit), in_q, out_q in zip(stages, queues, queues[1:]):
+        threading.Thread(
+            target=_stage_worker, args=(stage, fn, label, emit, in_q, out_q, events, cancelled), daemon=True
+        ).start()
+    
+    if audio_bytes is not None:
+        audio_q.put(audio_bytes)
+    else:
+        text_q.put(prompt)  # queued ahead of the STT stage's _DONE
+    audio_q.put(_DONE)
+    
+    try:
+        while True:
+            event = events.get()
+            if event == ("done", "tts"):
+                return
+            if event[0] != "done":
+                yield event
     finally:
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+        cancelled.set()
+        tts_pool.shutdown(wait=False, cancel_futures=True)
+
+def render_pipeline(events, user_text=None):
+    """Render pipeline events as they arrive and record the exchange in history.
+
+    Returns True only if a full reply came back without errors.
+    """
+    turn_id = uuid.uuid4().hex[:8]  # unique per turn, even for several turns in one run
+    progress = st.empty()
+    progress.info("🎤 Transcribing your voice..." if user_text is None else "🤔 Thinking...")
+    answer, audio_chunks, failed = "", [], False
+    try:
+        for stage, payload in events:
+            if stage == "error":
+                failed = True
+                st.error(payload)
+            elif stage == "stt":
+                if not payload:
+                    st.warning(f"🔇 Couldn't hear you - speak for at least {MIN_SPEECH_S:g} s, "
+                               "a little louder or closer to the mic.")
+                    continue
+                user_text = payload
+                st.session_state.transcription = payload
+                st.success("✅ Transcription complete!")
+                st.markdown("### 📝 What You Said:")
+                st.info(payload)
+                progress.info("🤔 Thinking of a response...")
+            elif stage == "llm":
+                if not answer:
+                    st.markdown("### 🤖 Bot Response:")
+                    answer_box = st.empty()
+                    progress.info("🔊 Generating voice response...")
+                answer += payload
+                answer_box.markdown(answer)
+            elif stage == "tts":
+                # Each sentence is playable as soon as all of its parts are synthesized
+                if not audio_chunks:
+                    st.markdown("### 🔊 Listen to Response:")
+                audio_chunks.append(payload)
+                st.audio(payload, format=TTS_FORMAT)
+    finally:
+        events.close()  # a rerun/Stop lands here and cancels the workers
+    progress.empty()
+    
+    audio = join_tts_audio(audio_chunks) if audio_chunks else None
+    if answer:
+        st.session_state.bot_response = answer
+        st.session_state.bot_audio = audio
+        st.session_state.conversation_history.append({
+            "id": turn_id,
+            "user": user_text,
+            "bot": answer,
+            "timestamp": get_time()
+        })
+    if audio:
+        st.caption("🔊 Audio plays through your current audio device")
+        st.download_button(
+            label="📥 Download",
+            data=audio,
+            file_name=f"response.{TTS_EXT}",
+            mime=TTS_FORMAT,
+            key=f"download-{turn_id}",
+        )
+    return bool(answer) and not failed
+
+# ------------------------------
+# Live Streaming Transcription
+# ------------------------------
+class AudioProcessor(AudioProcessorBase):
+    """Streams WebRTC mic frames to AssemblyAI's v3 realtime API while the user speaks.
+
+    recv() runs on the WebRTC media thread and only queues frames; a sender thread
+    opens the websocket, resamples and streams, so a slow handshake or network
+    never stalls the media track. Finalized turns are handed to the script
+    thread through `self.turns`, never via `st`.
+    """
+
+    def __init__(self):
+        self.turns = Queue()        # finalized, formatted transcripts
+        self.partial = ""           # in-progress turn text
+        self.error = None
+        self.client = None
+        # Stateful downmix + s16 + 16 kHz conversion; filtering carries across frame boundaries
+        self._resampler = av.AudioResampler(format="s16", layout="mono", rate=TARGET_SAMPLE_RATE)
+        self._pending = np.empty(TARGET_SAMPLE_RATE * STREAM_CHUNK_MS // 1000, dtype=np.int16)
+        self._pending_samples = 0
+        self._frames = Queue()      # raw WebRTC frames for the sender thread; None ends the session
+        self._sender = threading.Thread(target=self._send_frames, daemon=True)
+        self._sender.start()
+
+    def _connect(self):
+        client = StreamingClient(StreamingClientOptions(api_key=ASSEMBLYAI_API_KEY))
+        client.on(StreamingEvents.Turn, self._on_turn)
+        client.on(StreamingEvents.Error, self._on_error)
+        client.connect(StreamingParameters(
+            sample_rate=TARGET_SAMPLE_RATE,  # frames are downsampled before sending
+            format_turns=True,
+            min_end_of_turn_silence_when_confident=160,
+            # Force end-of-turn after 800 ms of silence following speech, even when
+            # the model isn't confident - the default waits up to 2.4 s
+            max_turn_silence=800,
+        ))
+        return client
+
+    def _on_turn(self, client, event):
+        if not event.end_of_turn:
+            self.partial = event.transcript
+        elif event.turn_is_formatted and event.transcript.strip():
+            self.turns.put(event.transcript.strip())
+            self.partial = ""
+
+    def _on_error(self, client, error):
+        self.error = str(error)
+
+    def _buffer(self, pcm):
+        """Copy 16 kHz PCM into the chunk buffer, streaming every full STREAM_CHUNK_MS chunk."""
+        while pcm.size:
+            take = min(pcm.size, self._pending.size - self._pending_samples)
+            self._pending[self._pending_samples:self._pending_samples + take] = pcm[:take]
+            self._pending_samples += take
+            pcm = pcm[take:]
+            if self._pending_samples == self._pending.size:
+                self.client.stream(self._pending.tobytes())
+                self._pending_samples = 0
+
+    def _send_frames(self):
+        if not ASSEMBLYAI_API_KEY:
+            return
+        try:
+            self.client = self._connect()
+        except Exception as e:
+            self.error = str(e)
+            return
+        while True:
+            frame = self._frames.get()  # frames captured during the handshake are waiting here
+            if frame is None:
+                break
+            # Converting at ingest means only 16 kHz mono is ever buffered or sent (3x less than 48 kHz)
+            for converted in self._resampler.resample(frame):
+                self._buffer(np.frombuffer(converted.planes[0], dtype=np.int16, count=converted.samples))
+        self.client.disconnect(terminate=True)
+        self.client = None
+
+    def recv(self, frame):
+        if self.error is None and ASSEMBLYAI_API_KEY:
+            self._frames.put(frame)
+        return frame
+
+    def on_ended(self):
+        self._frames.put(None)
+
+# Warm-up runs once per process; it needs the helpers above, so it starts here
+start_warmup()
 
 # ------------------------------
 # Main Interface Tabs
 # ------------------------------
-tab1, tab2, tab3 = st.tabs(["🎤 Voice Input", "📝 Text Input", "📜 History"])
+tab1, tab2, tab3, tab4 = st.tabs(["🎤 Voice Input", "⚡ Live Voice", "📝 Text Input", "📜 History"])
 
 # ------------------------------
 # Voice Input Tab
@@ -236,8 +993,8 @@ with tab1:
     with col_status1:
         st.info("🎤 **Ready:** Using your system's default audio device (built-in, USB, wired, or Bluetooth)")
     with col_status2:
-        if st.button("🔄 Refresh Page", help="Refresh if you just connected a new device"):
-            st.rerun()
+        # A click already reruns the script; an explicit st.rerun() would run it twice
+        st.button("🔄 Refresh Page", help="Refresh if you just connected a new device")
     
     st.markdown("---")
     
@@ -276,113 +1033,141 @@ with tab1:
         with col_info:
             st.metric("Audio Size", f"{len(audio_bytes) / 1024:.1f} KB")
         
+        accurate = st.toggle(
+            "🔬 High-accuracy transcription (slower)",
+            help="Uses AssemblyAI's `best` model instead of the low-latency `nano` model"
+        )
+        
+        # Debounce: a rerun must not bill STT + LLM twice for the same recording
+        audio_hash = audio_digest(audio_bytes)
+        audio_key = (audio_hash, accurate)
+        already_done = st.session_state.processed_hash == audio_key
+        
         # Process button
-        if st.button("🎯 Transcribe & Get Response", type="primary", use_container_width=True):
-            with st.spinner("🎤 Transcribing your voice..."):
-                transcription = transcribe_audio(audio_bytes)
-            
-            if transcription:
-                st.session_state.transcription = transcription
-                st.success("✅ Transcription complete!")
-                
-                # Display transcription
-                st.markdown("### 📝 What You Said:")
-                st.info(transcription)
-                
-                # Get AI response
-                with st.spinner("🤔 Thinking of a response..."):
-                    answer = get_response(transcription)
-                
-                if answer:
-                    st.session_state.bot_response = answer
-                    
-                    # Save to history
-                    st.session_state.conversation_history.append({
-                        "user": transcription,
-                        "bot": answer,
-                        "timestamp": get_time()
-                    })
-                    
-                    st.markdown("### 🤖 Bot Response:")
-                    st.write(answer)
-                    
-                    # Generate TTS
-                    with st.spinner("🔊 Generating voice response..."):
-                        tts_file = text_to_speech(answer)
-                    
-                    if tts_file:
-                        st.markdown("### 🔊 Listen to Response:")
-                        col_a, col_b = st.columns([3, 1])
-                        with col_a:
-                            st.audio(tts_file, format="audio/mp3")
-                            st.caption("🔊 Audio plays through your current audio device")
-                        with col_b:
-                            with open(tts_file, "rb") as f:
-                                st.download_button(
-                                    label="📥 Download",
-                                    data=f,
-                                    file_name="response.mp3",
-                                    mime="audio/mp3",
-                                    use_container_width=True
-                                )
-                        os.unlink(tts_file)
-            else:
-                st.error("❌ Failed to transcribe. Check Bluetooth connection and try again.")
+        # A second click while this runs interrupts the run (and cancels the pipeline)
+        # rather than starting another one, so no separate in-flight flag is needed
+        if st.button("🎯 Transcribe & Get Response", type="primary", use_container_width=True,
+                     disabled=already_done):
+            # Failed or silent turns stay retryable
+            if render_pipeline(run_pipeline(audio_bytes=audio_bytes, accurate=accurate,
+                                            audio_hash=audio_hash)):
+                st.session_state.processed_hash = audio_key
+        elif already_done:
+            st.caption("✅ Already answered this recording - record again to ask something new.")
+        
+        # Several recordings can be queued and transcribed together: all jobs are
+        # in flight at once, so the batch costs about one STT round-trip
+        queued = st.session_state.pending_clips
+        if st.button("➕ Queue for Batch", disabled=any(h == audio_hash for h, _ in queued),
+                     help="Record a few questions, then transcribe them all in one go"):
+            queued.append((audio_hash, audio_bytes))
+        
+        if queued and st.button(f"📦 Transcribe {len(queued)} Queued Recording(s)"):
+            try:
+                with st.spinner("🎤 Transcribing queued recordings..."):
+                    results = transcribe_many([clip for _, clip in queued], accurate)
+            except Exception as e:
+                st.error(f"❌ Transcription Error: {e}")
+                results = []
+            finally:
+                queued.clear()  # failed clips are reported below, not retried forever
+            for n, turn in enumerate(results, 1):
+                if isinstance(turn, Exception):
+                    st.error(f"❌ Recording {n}: {turn}")
+                elif not turn:
+                    st.warning(f"🔇 Recording {n}: less than {MIN_SPEECH_S:g} s of speech detected")
+                else:
+                    st.markdown("### 📝 What You Said:")
+                    st.info(turn)
+                    render_pipeline(run_pipeline(prompt=turn), user_text=turn)
+        
+        if queued:
+            st.button("🗑️ Clear Queue", on_click=queued.clear, help="Discard the queued recordings")
 
 # ------------------------------
-# Text Input Tab
+# Live Voice Tab
 # ------------------------------
+# A fragment polls for finished turns, so the script itself finishes and the
+# other tabs render and respond while a live session is running
+@st.fragment(run_every=LIVE_POLL_S)
+def live_conversation(ctx):
+    processor = ctx.audio_processor
+    if processor is None:
+        st.caption("🎧 Connecting...")
+        return
+    if processor.error:
+        st.error(f"❌ Live Transcription Error: {processor.error}")
+        return
+    history = st.session_state.conversation_history
+    try:
+        # Peek only: a full rerun can stop this run mid-reply, and the turn must survive it
+        turn = processor.turns.queue[0]
+    except IndexError:
+        # Every poll redraws the fragment, so keep the last answer on screen
+        if st.session_state.live_answer:
+            user, bot, audio = st.session_state.live_answer
+            st.markdown("### 📝 What You Said:")
+            st.info(user)
+            st.markdown("### 🤖 Bot Response:")
+            st.markdown(bot)
+            if audio:
+                st.audio(audio, format=TTS_FORMAT)
+        st.caption(f"🎧 {processor.partial or 'Listening...'}")
+        return
+    
+    st.markdown("### 📝 What You Said:")
+    st.info(turn)
+    answered = len(history)
+    render_pipeline(run_pipeline(prompt=turn), user_text=turn)
+    processor.turns.get_nowait()  # handled; only this thread takes turns off the queue
+    if len(history) > answered:
+        st.session_state.live_answer = (turn, history[-1]["bot"], st.session_state.bot_audio)
+
 with tab2:
+    st.subheader("Live Streaming Conversation")
+    st.caption("💡 Click START and just talk - your words are transcribed while you speak, "
+               "and the bot replies as soon as you finish a sentence.")
+    
+    if not ASSEMBLYAI_API_KEY:
+        st.warning("⚠️ Add ASSEMBLYAI_API_KEY to .env to enable live transcription.")
+    
+    ctx = webrtc_streamer(
+        key="live-voice",
+        mode=WebRtcMode.SENDRECV,
+        rtc_configuration=RTC_CONFIGURATION,
+        audio_processor_factory=AudioProcessor,
+        media_stream_constraints={"audio": {"sampleRate": 16000, "channelCount": 1}, "video": False},
+        sendback_audio=False,
+        async_processing=False,  # recv() must see every frame, not just the latest
+    )
+    
+    if ctx.state.playing:
+        live_conversation(ctx)
+
+# ------------------------------
+# Text Input Tab
+# ------------------------------
+with tab3:
     st.subheader("Text Input (Alternative)")
     user_text = st.text_area("Type your message:", height=150, placeholder="Ask me anything...")
     
     if st.button("Send Text", type="primary"):
         if user_text.strip():
-            with st.spinner("🤔 Thinking..."):
-                answer = get_response(user_text)
-            
-            if answer:
-                # Save to history
-                st.session_state.conversation_history.append({
-                    "user": user_text,
-                    "bot": answer,
-                    "timestamp": get_time()
-                })
-                
-                st.markdown("### 🤖 Bot Response:")
-                st.write(answer)
-                
-                with st.spinner("🔊 Generating voice..."):
-                    tts_file = text_to_speech(answer)
-                
-                if tts_file:
-                    col_a, col_b = st.columns([3, 1])
-                    with col_a:
-                        st.audio(tts_file, format="audio/mp3")
-                        st.caption("🔊 Audio plays through your current audio device")
-                    with col_b:
-                        with open(tts_file, "rb") as f:
-                            st.download_button(
-                                label="📥 Download",
-                                data=f,
-                                file_name="response.mp3",
-                                mime="audio/mp3",
-                                use_container_width=True
-                            )
-                    os.unlink(tts_file)
+            render_pipeline(run_pipeline(prompt=user_text), user_text=user_text)
         else:
             st.warning("Please enter some text first.")
 
 # ------------------------------
 # Conversation History Tab
 # ------------------------------
-with tab3:
+# Clicks in here rerun only this function, not the recorder/WebRTC tabs above
+@st.fragment
+def render_history():
     st.subheader("Conversation History")
     
     if st.session_state.conversation_history:
-        if st.button("🗑️ Clear History"):
-            st.session_state.conversation_history = []
-            st.rerun()
+        # Clearing in the callback means the rerun already draws the empty history
+        st.button("🗑️ Clear History", on_click=st.session_state.conversation_history.clear)
         
         st.markdown("---")
         for idx, exchange in enumerate(reversed(st.session_state.conversation_history)):
@@ -398,6 +1183,18 @@ with tab3:
                 st.markdown("---")
     else:
         st.info("No conversations yet. Start recording in the Voice Input tab!")
+    
+    # Cached replies and transcripts are shared by every session on this server
+    if st.button("🧹 Clear Cached Replies", help="Forget cached bot replies and transcripts"):
+        cache, lock = _response_cache()
+        with lock:
+            cache.clear()
+        _llm_disk_cache().clear()
+        _transcribe_cached.clear()
+        st.success("✅ Cache cleared!")
+
+with tab4:
+    render_history()
 
 # ------------------------------
 # Audio Device Testing Section
@@ -431,11 +1228,16 @@ with st.expander("📦 Installation & Setup"):
     st.code("""
 # Install required packages
 pip install streamlit
+pip install streamlit-webrtc
 pip install audio-recorder-streamlit
 pip install assemblyai
 pip install gtts
-pip install requests
+pip install requests "urllib3>=2"
 pip install python-dotenv
+pip install numpy scipy av
+pip install diskcache orjson
+# Optional, for offline TTS (USE_LOCAL_TTS=1):
+pip install piper-tts
 
 # Create .env file with:
 OPENROUTER_API_KEY=your_openrouter_key
@@ -447,7 +1249,7 @@ streamlit run app.py
     
     st.markdown("""
     ### 🔧 System Requirements:
-    - **Python:** 3.8 or higher
+    - **Python:** 3.9 or higher
     - **Browser:** Chrome, Firefox, Safari, or Edge (latest version)
     - **Audio Device:** Any microphone (built-in, USB, wired, or Bluetooth)
     - **Internet:** Required for API calls